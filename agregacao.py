@@ -0,0 +1,269 @@
+# Agregação particionada por segmento (afiliado, cidade, estado...)
+# O processo principal distribui as linhas entre as partições pelo hash da
+# chave (código % partições), uma única vez, e grava as colunas já agrupadas
+# por partição na memória compartilhada. Cada processo lê só a sua fatia,
+# calcula as métricas das suas chaves e o processo principal junta os resultados.
+
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+# Abaixo disso, subir processos custa mais do que agregar direto
+LIMITE_PARALELO = 200_000
+
+NS_POR_DIA = 86_400 * 10**9
+# 1970-01-06 (dia 5) é terça: semanas de terça a segunda, como o resample('W-Mon') dos apps
+DIA_ORIGEM_SEMANA = 5
+NAT = np.iinfo(np.int64).min
+
+_executor = None
+_executor_processos = 0
+_lock_executor = threading.Lock()
+
+COLUNAS_METRICAS = ["Vendas", "Faturamento", "Ticket Médio", "Comissão", "% Comissão", "% Estornos", "Tendência Semanal (%)"]
+COLUNAS_PEDIDO = ["pedido", "data", "posicao", "codigo", "estornada"]
+
+# Última linha de cada pedido: maior data (NaT por último, como no sort_values
+# de calcular_estorno) e, no empate, a última posição no arquivo.
+# Chave e status vêm sempre da mesma linha.
+# As linhas precisam chegar em ordem de posição: o lexsort é estável e desempata por ela.
+def _ultimas_por_pedido(pedido, data, posicao, codigo, estornada):
+    com_pedido = pedido >= 0
+    pedido, data, posicao, codigo, estornada = (
+        valores[com_pedido] for valores in (pedido, data, posicao, codigo, estornada)
+    )
+    ordem = np.lexsort((data, pedido))
+    if len(ordem):
+        pedido_ordenado = pedido[ordem]
+        ordem = ordem[np.append(pedido_ordenado[1:] != pedido_ordenado[:-1], True)]
+    return {
+        "pedido": pedido[ordem],
+        "data": data[ordem],
+        "posicao": posicao[ordem],
+        "codigo": codigo[ordem],
+        "estornada": estornada[ordem],
+    }
+
+# Métricas das chaves de uma partição (chave local = código // n_particoes).
+# `colunas` já é só a fatia da partição.
+def _metricas_particao(colunas, n_chaves, n_semanas, particao, n_particoes):
+    codigos = colunas["codigo"]
+    com_chave = codigos >= 0
+    locais = codigos[com_chave] // n_particoes
+    n_locais = len(range(particao, n_chaves, n_particoes))
+    total = colunas["total"][com_chave]
+
+    parcial = {
+        "vendas": np.bincount(locais, minlength=n_locais),
+        "faturamento": np.bincount(locais, weights=total, minlength=n_locais),
+        "com_total": np.bincount(locais, weights=colunas["tem_total"][com_chave], minlength=n_locais),
+        "comissao": np.bincount(locais, weights=colunas["comissao"][com_chave], minlength=n_locais),
+        "tendencia": np.full(n_locais, np.nan),
+    }
+
+    # Tendência: inclinação da reta do faturamento semanal, em % da média semanal
+    if n_semanas > 1:
+        semanas = colunas["semana"][com_chave]
+        com_data = semanas >= 0
+        celulas = locais[com_data] * n_semanas + semanas[com_data]
+        semanal = np.bincount(
+            celulas, weights=total[com_data], minlength=n_locais * n_semanas
+        ).reshape(n_locais, n_semanas)
+        x = np.arange(n_semanas) - (n_semanas - 1) / 2
+        inclinacao = semanal @ x / (x @ x)
+        media = semanal.mean(axis=1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            parcial["tendencia"] = np.where(media > 0, inclinacao / media * 100, np.nan)
+
+    # Estornos: candidatas à última linha de cada pedido; um pedido com linhas
+    # em outras partições é decidido na junção
+    candidatas = _ultimas_por_pedido(*(colunas[nome] for nome in COLUNAS_PEDIDO))
+    return parcial, candidatas
+
+# Executado em cada processo: abre os buffers compartilhados e agrega só a fatia da partição
+def _agregar_particao(memorias, n_linhas, inicio, fim, n_chaves, n_semanas, particao, n_particoes):
+    blocos = {nome: shared_memory.SharedMemory(name=memoria) for nome, (memoria, _) in memorias.items()}
+    try:
+        colunas = {
+            nome: np.ndarray((n_linhas,), dtype=tipo, buffer=blocos[nome].buf)[inicio:fim]
+            for nome, (_, tipo) in memorias.items()
+        }
+        parcial, candidatas = _metricas_particao(colunas, n_chaves, n_semanas, particao, n_particoes)
+        del colunas
+        return particao, parcial, candidatas
+    finally:
+        for bloco in blocos.values():
+            bloco.close()
+
+# Distribui as linhas pelas partições: linhas com chave vão para código % n;
+# linhas sem chave (só contam para achar a última linha do pedido) vão para pedido % n.
+# Devolve a permutação (estável) que agrupa as linhas por partição e os limites de cada fatia.
+def _particionar(colunas, n_particoes):
+    destino = np.where(colunas["codigo"] >= 0, colunas["codigo"], colunas["pedido"]) % n_particoes
+    ordem = np.argsort(destino, kind="stable")
+    limites = np.zeros(n_particoes + 1, dtype=np.int64)
+    limites[1:] = np.cumsum(np.bincount(destino, minlength=n_particoes))
+    return ordem, limites
+
+# Copia cada coluna, já na ordem das partições, para um bloco de memória compartilhada
+def _compartilhar(colunas, ordem):
+    blocos = {}
+    try:
+        for nome, valores in colunas.items():
+            bloco = shared_memory.SharedMemory(create=True, size=max(valores.nbytes, 1))
+            blocos[nome] = bloco
+            np.take(valores, ordem, out=np.ndarray(valores.shape, dtype=valores.dtype, buffer=bloco.buf))
+    except Exception:
+        _liberar(blocos)
+        raise
+    return blocos
+
+def _liberar(blocos):
+    for bloco in blocos.values():
+        bloco.close()
+        bloco.unlink()
+
+# Pool de processos único, criado na primeira agregação paralela e reaproveitado.
+# Usa forkserver/spawn: um fork do servidor do Streamlit (com várias threads) não é seguro.
+def _obter_executor(processos):
+    global _executor, _executor_processos
+    with _lock_executor:
+        if _executor is None or _executor_processos != processos:
+            if _executor is not None:
+                _executor.shutdown(wait=False)
+            metodo = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+            _executor = ProcessPoolExecutor(max_workers=processos, mp_context=multiprocessing.get_context(metodo))
+            _executor_processos = processos
+        return _executor
+
+def _descartar_executor():
+    global _executor
+    with _lock_executor:
+        _executor = None
+
+# Converte o DataFrame nas colunas numéricas usadas pela agregação.
+# Só operações vetorizadas de uma passada (factorize, to_numeric): o resto é das partições.
+def _preparar_colunas(df, coluna, coluna_data):
+    n = len(df)
+    codigos, chaves = pd.factorize(df[coluna])
+
+    def numerica(nome):
+        if nome not in df.columns:
+            return np.zeros(n), np.zeros(n)
+        valores = pd.to_numeric(df[nome], errors="coerce").to_numpy(dtype=np.float64)
+        presentes = ~np.isnan(valores)
+        return np.where(presentes, valores, 0.0), presentes.astype(np.float64)
+
+    total, tem_total = numerica("Total")
+    comissao, _ = numerica("Comissão")
+
+    # Pedidos e status: o status é comparado uma vez por valor distinto, não por linha
+    if "Código" in df.columns and "Status" in df.columns:
+        pedidos, _ = pd.factorize(df["Código"])
+        codigos_status, status = pd.factorize(df["Status"])
+        estornado = np.asarray(pd.Index(status).astype(str).str.lower() == "estornada", dtype=np.float64)
+        estornada = np.append(estornado, 0.0)[codigos_status]
+    else:
+        pedidos, estornada = np.full(n, -1), np.zeros(n)
+
+    datas = np.zeros(n, dtype=np.int64)
+    semana = np.full(n, -1, dtype=np.int64)
+    n_semanas = 0
+    if coluna_data in df.columns and pd.api.types.is_datetime64_any_dtype(df[coluna_data]):
+        ns = df[coluna_data].to_numpy(dtype="datetime64[ns]").view(np.int64)
+        com_data = ns != NAT
+        datas = np.where(com_data, ns, np.iinfo(np.int64).max)
+        com_data &= codigos >= 0
+        if com_data.any():
+            numeros = (ns[com_data] // NS_POR_DIA - DIA_ORIGEM_SEMANA) // 7
+            semana[com_data] = numeros - numeros.min()
+            n_semanas = int(semana.max()) + 1
+
+    colunas = {
+        "codigo": codigos.astype(np.int64),
+        "total": total,
+        "tem_total": tem_total,
+        "comissao": comissao,
+        "semana": semana,
+        "pedido": pedidos.astype(np.int64),
+        "data": datas,
+        "posicao": np.arange(n, dtype=np.int64),
+        "estornada": estornada,
+    }
+    uteis = (colunas["codigo"] >= 0) | (colunas["pedido"] >= 0)
+    if not uteis.all():
+        colunas = {nome: valores[uteis] for nome, valores in colunas.items()}
+    return colunas, chaves, n_semanas
+
+# Métricas por segmento: vendas, faturamento, ticket médio, comissão,
+# participação na comissão, taxa de estornos e tendência semanal.
+# Com muitas linhas, a agregação é dividida entre `processos` processos.
+def agregar_por_segmento(df, coluna, coluna_data="Iniciada em", processos=None):
+    colunas, chaves, n_semanas = _preparar_colunas(df, coluna, coluna_data)
+    n_linhas = len(colunas["codigo"])
+    n_chaves = len(chaves)
+    processos = processos or os.cpu_count() or 1
+    n_particoes = max(1, min(processos, n_chaves))
+
+    if n_particoes == 1 or n_linhas < LIMITE_PARALELO:
+        n_particoes = 1
+        parciais = {0: _metricas_particao(colunas, n_chaves, n_semanas, 0, 1)}
+    else:
+        ordem, limites = _particionar(colunas, n_particoes)
+        blocos = _compartilhar(colunas, ordem)
+        del ordem
+        memorias = {nome: (blocos[nome].name, valores.dtype.str) for nome, valores in colunas.items()}
+        try:
+            executor = _obter_executor(processos)
+            futuros = [
+                executor.submit(
+                    _agregar_particao, memorias, n_linhas, limites[particao], limites[particao + 1],
+                    n_chaves, n_semanas, particao, n_particoes
+                )
+                for particao in range(n_particoes)
+            ]
+            parciais = {particao: (parcial, candidatas) for particao, parcial, candidatas in (f.result() for f in futuros)}
+        except BrokenProcessPool:
+            _descartar_executor()
+            raise
+        finally:
+            _liberar(blocos)
+
+    # Junta as partições: a chave local i da partição p é o código p + i * n_particoes
+    resultado = {nome: np.zeros(n_chaves) for nome in parciais[0][0]}
+    for particao, (parcial, _) in parciais.items():
+        for nome, valores in parcial.items():
+            resultado[nome][particao::n_particoes] = valores
+
+    # Estornos por pedido: a última linha entre as candidatas de todas as partições
+    if n_particoes == 1:
+        ultimas = parciais[0][1]
+    else:
+        candidatas = {
+            nome: np.concatenate([candidatas[nome] for _, candidatas in parciais.values()]) for nome in COLUNAS_PEDIDO
+        }
+        por_posicao = np.argsort(candidatas["posicao"])
+        ultimas = _ultimas_por_pedido(*(candidatas[nome][por_posicao] for nome in COLUNAS_PEDIDO))
+    com_chave = ultimas["codigo"] >= 0
+    pedidos = np.bincount(ultimas["codigo"][com_chave], minlength=n_chaves)
+    estornos = np.bincount(ultimas["codigo"][com_chave], weights=ultimas["estornada"][com_chave], minlength=n_chaves)
+
+    comissao_total = resultado["comissao"].sum()
+    with np.errstate(divide="ignore", invalid="ignore"):
+        tabela = pd.DataFrame({
+            "Vendas": resultado["vendas"].astype(np.int64),
+            "Faturamento": resultado["faturamento"],
+            "Ticket Médio": np.where(resultado["com_total"] > 0, resultado["faturamento"] / resultado["com_total"], 0.0),
+            "Comissão": resultado["comissao"],
+            "% Comissão": resultado["comissao"] / comissao_total * 100 if comissao_total else np.zeros(n_chaves),
+            "% Estornos": np.where(pedidos > 0, estornos / pedidos * 100, 0.0),
+            "Tendência Semanal (%)": resultado["tendencia"],
+        }, index=pd.Index(chaves, name=coluna), columns=COLUNAS_METRICAS)
+
+    return tabela.sort_values("Faturamento", ascending=False)
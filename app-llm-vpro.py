@@ -8,10 +8,12 @@
 # Baixar relatório filtrado em CSV
 
 import streamlit as st
-import pandas as pd
-import numpy as np
 from datetime import datetime, timedelta
 
+from aquecimento import iniciar_aquecimento, tarefas_snapshot, salvar_snapshot, usar_snapshot, chave_snapshot
+
+NOME_APP = "app-llm-vpro"
+
 # Funções auxiliares
 def formatar_reais(valor):
     try:
@@ -20,6 +22,8 @@ def formatar_reais(valor):
         return "R$ 0,00"
 
 def corrigir_coluna(df, col):
+    import pandas as pd
+
     try:
         df[col] = (
             df[col]
@@ -52,7 +56,7 @@ def calcular_chargeback(df):
     chargeback_rate = (len(chargebacks) / total_vendas) * 100 if total_vendas > 0 else 0
     return chargeback_rate
 
-def responder_pergunta(pergunta, df):
+def responder_pergunta(pergunta, df, rankings=None):
     pergunta = pergunta.lower()
     mapeamento = {
         "total de vendas": ["total de vendas", "quanto vendi", "faturamento", "vendas totais"],
@@ -76,11 +80,17 @@ def responder_pergunta(pergunta, df):
                     produtos = df['Produto'].value_counts()
                     return "🛍️ Produtos vendidos:\n" + "\n".join([f"{produto}: {quantidade}" for produto, quantidade in produtos.items()])
                 elif intencao == "top afiliados":
-                    afiliados = df['Afiliado (Nome)'].value_counts().head(5)
-                    return "🏆 Top afiliados:\n" + "\n".join([f"{afiliado}: {quantidade}" for afiliado, quantidade in afiliados.items()])
+                    if rankings is not None:
+                        afiliados = rankings.top_contagem('Afiliado (Nome)', 5)
+                    else:
+                        afiliados = df['Afiliado (Nome)'].value_counts().head(5).items()
+                    return "🏆 Top afiliados:\n" + "\n".join([f"{afiliado}: {quantidade}" for afiliado, quantidade in afiliados])
                 elif intencao == "faturamento por cidade":
-                    cidades = df.groupby('Cliente (Cidade)')["Total"].sum().sort_values(ascending=False)
-                    return "🏙️ Faturamento por cidade:\n" + "\n".join([f"{cidade}: {formatar_reais(valor)}" for cidade, valor in cidades.items()])
+                    if rankings is not None:
+                        cidades = rankings.top_faturamento('Cliente (Cidade)')
+                    else:
+                        cidades = df.groupby('Cliente (Cidade)')["Total"].sum().sort_values(ascending=False).items()
+                    return "🏙️ Faturamento por cidade:\n" + "\n".join([f"{cidade}: {formatar_reais(valor)}" for cidade, valor in cidades])
 
     return "❓ Não entendi sua pergunta. Tente reformular."
 
@@ -89,9 +99,14 @@ def main():
     st.set_page_config(page_title="SalesDataAgent PRO", layout="wide")
     st.title("🧪 SalesDataAgent TURBO")
 
+    iniciar_aquecimento(tarefas_snapshot(NOME_APP))
+
     uploaded_file = st.file_uploader("📎 Faça upload do seu arquivo CSV", type=["csv"])
 
+    df = None
     if uploaded_file:
+        import pandas as pd
+
         df = pd.read_csv(uploaded_file, delimiter=";")
 
         for col in ["Total", "Comissão", "Desconto (Valor)", "Taxas"]:
@@ -102,6 +117,12 @@ def main():
             df["Iniciada em"] = pd.to_datetime(df["Iniciada em"], errors='coerce')
 
         st.success("Arquivo carregado com sucesso!")
+        salvar_snapshot(df, NOME_APP, uploaded_file.file_id)
+    else:
+        df = usar_snapshot(NOME_APP)
+
+    if df is not None:
+        import numpy as np
 
         st.subheader("🗓️ Selecione o Período para Análise")
         data_min = df["Iniciada em"].min().date()
@@ -172,6 +193,13 @@ def main():
 
         st.subheader("🧠 Perguntas Inteligentes")
 
+        # Rankings mantidos só valem para o dataset inteiro
+        rankings = None
+        if periodo_opcao == "Todo o Período":
+            from rankings import rankings_da_sessao
+
+            rankings = rankings_da_sessao(df_filtrado, uploaded_file.file_id if uploaded_file else chave_snapshot(NOME_APP))
+
         perguntas_cards = {
             "💰 Total de vendas": "total de vendas",
             "💸 Total de comissões": "total de comissões",
@@ -184,12 +212,12 @@ def main():
         cols = st.columns(3)
         for i, (titulo, intencao) in enumerate(perguntas_cards.items()):
             if cols[i % 3].button(titulo):
-                resposta = responder_pergunta(intencao, df_filtrado)
+                resposta = responder_pergunta(intencao, df_filtrado, rankings)
                 st.success(resposta)
 
         pergunta_livre = st.text_input("✏️ Ou digite sua própria pergunta:")
         if pergunta_livre:
-            resposta = responder_pergunta(pergunta_livre, df_filtrado)
+            resposta = responder_pergunta(pergunta_livre, df_filtrado, rankings)
             st.info(resposta)
 
         # Cards principais
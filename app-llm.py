@@ -1,9 +1,13 @@
 import streamlit as st
-import pandas as pd
-import matplotlib.pyplot as plt
+
+from aquecimento import iniciar_aquecimento, tarefas_snapshot, salvar_snapshot, usar_snapshot, chave_snapshot
+
+NOME_APP = "app-llm"
 
 # Função para carregar dados
 def carregar_dados(caminho_csv):
+    import pandas as pd
+
     df = pd.read_csv(caminho_csv, delimiter=";")
     # Converter datas
     for coluna in ['Iniciada em', 'Finalizada em', 'Estornada em']:
@@ -12,7 +16,9 @@ def carregar_dados(caminho_csv):
     return df
 
 # Função para gerar insights automáticos
-def gerar_insights(df):
+def gerar_insights(df, rankings):
+    import pandas as pd
+
     insights = []
 
     # Conversões seguras para números
@@ -59,23 +65,23 @@ def gerar_insights(df):
 
     # Vendas por Cidade
     if 'Cliente (Cidade)' in df.columns:
-        vendas_cidade = df['Cliente (Cidade)'].value_counts().nlargest(5)
+        vendas_cidade = rankings.top_contagem('Cliente (Cidade)', 5)
         insights.append("🏙️ Vendas por Cidade (Top 5):")
-        for cidade, count in vendas_cidade.items():
+        for cidade, count in vendas_cidade:
             insights.append(f"  {cidade}: {count} vendas")
 
     # Vendas por Estado
     if 'Cliente (Estado)' in df.columns:
-        vendas_estado = df['Cliente (Estado)'].value_counts().nlargest(5)
+        vendas_estado = rankings.top_contagem('Cliente (Estado)', 5)
         insights.append("🏠 Vendas por Estado (Top 5):")
-        for estado, count in vendas_estado.items():
+        for estado, count in vendas_estado:
             insights.append(f"  {estado}: {count} vendas")
 
     # Vendas por Afiliado
     if 'Afiliado (Nome)' in df.columns:
-        vendas_afiliado = df['Afiliado (Nome)'].value_counts().nlargest(5)
+        vendas_afiliado = rankings.top_contagem('Afiliado (Nome)', 5)
         insights.append("🤝 Vendas por Afiliado (Top 5):")
-        for afiliado, count in vendas_afiliado.items():
+        for afiliado, count in vendas_afiliado:
             insights.append(f"  {afiliado}: {count} vendas")
 
     return insights
@@ -83,6 +89,8 @@ def gerar_insights(df):
 # Função para gerar gráfico de vendas diárias
 def gerar_grafico(df):
     if 'Iniciada em' in df.columns and 'Total' in df.columns:
+        import matplotlib.pyplot as plt
+
         df_temp = df.copy()
         df_temp = df_temp.set_index('Iniciada em')
         vendas_diarias = df_temp['Total'].resample('D').sum()
@@ -97,7 +105,7 @@ def gerar_grafico(df):
         return None
 
 # Função para responder perguntas livres usando o próprio pandas
-def responder_pergunta(pergunta, df):
+def responder_pergunta(pergunta, df, rankings):
     pergunta = pergunta.lower()
 
     if "total" in pergunta and "venda" in pergunta:
@@ -114,11 +122,11 @@ def responder_pergunta(pergunta, df):
             return f"O mês de maior faturamento foi {mes_top.strftime('%B/%Y')} com R$ {valor_top:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
     elif "cidade" in pergunta:
         if 'Cliente (Cidade)' in df.columns:
-            top_cidade = df['Cliente (Cidade)'].value_counts().idxmax()
+            top_cidade = rankings.top_contagem('Cliente (Cidade)', 1)[0][0]
             return f"A cidade com mais vendas foi {top_cidade}"
     elif "estado" in pergunta:
         if 'Cliente (Estado)' in df.columns:
-            top_estado = df['Cliente (Estado)'].value_counts().idxmax()
+            top_estado = rankings.top_contagem('Cliente (Estado)', 1)[0][0]
             return f"O estado com mais vendas foi {top_estado}"
     else:
         return "❓ Pergunta não reconhecida. Tente perguntar sobre vendas, clientes, cidades ou estados."
@@ -128,15 +136,24 @@ def main():
     st.set_page_config(page_title="Agente de Vendas 5.0", layout="wide")
     st.title("🤖 Agente de Análise de Vendas 5.0 - Formato BR 🇧🇷")
 
+    iniciar_aquecimento(tarefas_snapshot(NOME_APP))
+
     arquivo = st.file_uploader("📂 Faça upload do seu arquivo CSV", type=["csv"])
 
     if arquivo is not None:
         df = carregar_dados(arquivo)
-        
+        salvar_snapshot(df, NOME_APP, arquivo.file_id)
+    else:
+        df = usar_snapshot(NOME_APP)
+
+    if df is not None:
         st.subheader("📋 Pré-visualização dos Dados")
         st.dataframe(df.head(20))
 
-        insights = gerar_insights(df)
+        from rankings import rankings_da_sessao
+
+        rankings = rankings_da_sessao(df, arquivo.file_id if arquivo is not None else chave_snapshot(NOME_APP))
+        insights = gerar_insights(df, rankings)
 
         st.subheader("🔍 Insights Automáticos")
         for insight in insights:
@@ -153,7 +170,7 @@ def main():
         pergunta = st.text_input("Escreva sua pergunta sobre os dados...")
 
         if pergunta:
-            resposta = responder_pergunta(pergunta, df)
+            resposta = responder_pergunta(pergunta, df, rankings)
             st.success(resposta)
 
 if __name__ == "__main__":
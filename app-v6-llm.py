@@ -1,10 +1,11 @@
 # versão com perguntas predefinidas e filtros
 import streamlit as st
-import pandas as pd
-import numpy as np
 from datetime import datetime
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
+from functools import lru_cache
+
+from aquecimento import iniciar_aquecimento, tarefas_snapshot, salvar_snapshot, usar_snapshot, chave_snapshot, obter
+
+NOME_APP = "app-v6-llm"
 
 # Função para formatar valores no padrão brasileiro
 def formatar_reais(valor):
@@ -15,6 +16,8 @@ def formatar_reais(valor):
 
 # Função para corrigir valores numéricos
 def corrigir_coluna(df, col):
+    import pandas as pd
+
     try:
         df[col] = (
             df[col]
@@ -30,45 +33,57 @@ def corrigir_coluna(df, col):
         st.error(f"Erro ao processar a coluna {col}: {e}")
     return df
 
-# Função para interpretar perguntas livres
-def interpretar_pergunta(pergunta, df):
-    pergunta = pergunta.lower()
-
-    intencoes = {
-        "total de vendas": [
-            "total de vendas", "quanto vendi", "total vendido", "vendas realizadas", "quanto foi faturado", "faturamento total", "valor arrecadado"
-        ],
-        "total de comissões": [
-            "total comissão", "comissão paga", "quanto comissionei", "quanto paguei de comissão", "comissões totais", "valor de comissão"
-        ],
-        "clientes únicos": [
-            "quantos clientes", "clientes diferentes", "clientes únicos", "quantos compradores", "número de clientes", "quantas pessoas compraram"
-        ],
-        "produtos vendidos": [
-            "quais produtos", "produtos vendidos", "lista de produtos", "o que foi vendido", "produtos comercializados", "produtos comprados"
-        ],
-        "top afiliados": [
-            "quem vendeu mais", "melhores afiliados", "top afiliados", "quem gerou mais vendas", "afiliado que mais vendeu", "ranking de afiliados"
-        ],
-        "faturamento por cidade": [
-            "vendas por cidade", "faturamento cidade", "cidade vendeu", "qual cidade vendeu mais", "ranking cidades vendas", "vendas por localização"
-        ],
-        "ticket médio": [
-            "ticket médio", "valor médio de venda", "quanto é o ticket médio", "média por venda", "ticket médio vendas"
-        ],
-        "quantidade de vendas": [
-            "quantidade de vendas", "quantas vendas fiz", "número de vendas", "vendas totais", "total de pedidos"
-        ]
-    }
+# Frases de exemplo de cada intenção
+INTENCOES = {
+    "total de vendas": [
+        "total de vendas", "quanto vendi", "total vendido", "vendas realizadas", "quanto foi faturado", "faturamento total", "valor arrecadado"
+    ],
+    "total de comissões": [
+        "total comissão", "comissão paga", "quanto comissionei", "quanto paguei de comissão", "comissões totais", "valor de comissão"
+    ],
+    "clientes únicos": [
+        "quantos clientes", "clientes diferentes", "clientes únicos", "quantos compradores", "número de clientes", "quantas pessoas compraram"
+    ],
+    "produtos vendidos": [
+        "quais produtos", "produtos vendidos", "lista de produtos", "o que foi vendido", "produtos comercializados", "produtos comprados"
+    ],
+    "top afiliados": [
+        "quem vendeu mais", "melhores afiliados", "top afiliados", "quem gerou mais vendas", "afiliado que mais vendeu", "ranking de afiliados"
+    ],
+    "faturamento por cidade": [
+        "vendas por cidade", "faturamento cidade", "cidade vendeu", "qual cidade vendeu mais", "ranking cidades vendas", "vendas por localização"
+    ],
+    "ticket médio": [
+        "ticket médio", "valor médio de venda", "quanto é o ticket médio", "média por venda", "ticket médio vendas"
+    ],
+    "quantidade de vendas": [
+        "quantidade de vendas", "quantas vendas fiz", "número de vendas", "vendas totais", "total de pedidos"
+    ]
+}
+
+# Função para treinar o modelo de intenções (uma vez por processo)
+@lru_cache(maxsize=1)
+def carregar_modelo_intencoes():
+    from sklearn.feature_extraction.text import TfidfVectorizer
 
     corpus, tags = [], []
-    for key, frases in intencoes.items():
+    for key, frases in INTENCOES.items():
         for frase in frases:
             corpus.append(frase)
             tags.append(key)
 
     vectorizer = TfidfVectorizer()
     X = vectorizer.fit_transform(corpus)
+    return vectorizer, X, tags
+
+# Função para interpretar perguntas livres
+def interpretar_pergunta(pergunta, df, rankings=None):
+    import numpy as np
+    from sklearn.metrics.pairwise import cosine_similarity
+
+    pergunta = pergunta.lower()
+
+    vectorizer, X, tags = obter("modelo_intencoes", carregar_modelo_intencoes)
     pergunta_vec = vectorizer.transform([pergunta])
 
     similaridades = cosine_similarity(pergunta_vec, X)
@@ -88,11 +103,17 @@ def interpretar_pergunta(pergunta, df):
         produtos = df["Produto"].unique()
         return "🛍️ Produtos vendidos:\n" + "\n".join(produtos)
     elif intencao_detectada == "top afiliados":
-        afiliados = df["Afiliado (Nome)"].value_counts().head(5)
-        return "🏆 Top afiliados:\n" + "\n".join([f"{k}: {v} vendas" for k, v in afiliados.items()])
+        if rankings is not None:
+            afiliados = rankings.top_contagem("Afiliado (Nome)", 5)
+        else:
+            afiliados = df["Afiliado (Nome)"].value_counts().head(5).items()
+        return "🏆 Top afiliados:\n" + "\n".join([f"{k}: {v} vendas" for k, v in afiliados])
     elif intencao_detectada == "faturamento por cidade":
-        cidades = df.groupby("Cliente (Cidade)")["Total"].sum().sort_values(ascending=False).head(5)
-        return "🌍 Faturamento por cidade:\n" + "\n".join([f"{k}: {formatar_reais(v)}" for k, v in cidades.items()])
+        if rankings is not None:
+            cidades = rankings.top_faturamento("Cliente (Cidade)", 5)
+        else:
+            cidades = df.groupby("Cliente (Cidade)")["Total"].sum().sort_values(ascending=False).head(5).items()
+        return "🌍 Faturamento por cidade:\n" + "\n".join([f"{k}: {formatar_reais(v)}" for k, v in cidades])
     elif intencao_detectada == "ticket médio":
         vendas = df["Total"].sum()
         quantidade = df["Total"].count()
@@ -104,14 +125,30 @@ def interpretar_pergunta(pergunta, df):
     else:
         return "🤖 Desculpe, não entendi a pergunta. Tente reformular!"
 
+# Função para calcular métricas por segmento, uma vez por arquivo e combinação de filtros
+# (o DataFrame, com "_", fica fora da chave do cache)
+@st.cache_data(show_spinner=False, max_entries=32)
+def metricas_por_segmento(chave_arquivo, data_inicio, data_fim, afiliado, cidade, coluna, _df_filtrado):
+    from agregacao import agregar_por_segmento
+
+    return agregar_por_segmento(_df_filtrado, coluna)
+
 # Função principal
 def main():
     st.set_page_config(page_title="SalesDataAgent TURBO", layout="wide")
     st.title("🧪 SalesDataAgent TURBO")
 
+    iniciar_aquecimento({
+        "modelo_intencoes": carregar_modelo_intencoes,
+        **tarefas_snapshot(NOME_APP)
+    })
+
     uploaded_file = st.file_uploader("📎 Faça upload do seu arquivo CSV", type=["csv"])
 
+    df = None
     if uploaded_file:
+        import pandas as pd
+
         df = pd.read_csv(uploaded_file, delimiter=";")
 
         for col in ["Total", "Comissão", "Desconto (Valor)", "Taxas"]:
@@ -122,7 +159,11 @@ def main():
             df["Iniciada em"] = pd.to_datetime(df["Iniciada em"], errors='coerce')
 
         st.success("Arquivo carregado com sucesso!")
+        salvar_snapshot(df, NOME_APP, uploaded_file.file_id)
+    else:
+        df = usar_snapshot(NOME_APP)
 
+    if df is not None:
         # --- FILTROS ---
         st.sidebar.header("🔍 Filtros")
 
@@ -158,16 +199,25 @@ def main():
         col2.metric("Total de Comissões", formatar_reais(df_filtrado["Comissão"].sum()))
         col3.metric("Clientes Únicos", df_filtrado["Cliente (E-mail)"].nunique())
 
+        # Métricas por cidade e por afiliado (agregação particionada)
+        chave_arquivo = uploaded_file.file_id if uploaded_file else chave_snapshot(NOME_APP)
+        filtros = (chave_arquivo, data_inicio, data_fim, afiliado, cidade)
+        por_cidade = metricas_por_segmento(*filtros, "Cliente (Cidade)", df_filtrado)
+        por_afiliado = metricas_por_segmento(*filtros, "Afiliado (Nome)", df_filtrado)
+
         # Gráfico de vendas por cidade
         st.subheader("🌍 Faturamento por Cidade")
-        cidades = df_filtrado.groupby("Cliente (Cidade)")["Total"].sum().sort_values(ascending=False)
-        st.bar_chart(cidades)
+        st.bar_chart(por_cidade["Faturamento"])
 
         # Ranking de afiliados
         st.subheader("🏆 Ranking de Afiliados")
-        afiliados = df_filtrado["Afiliado (Nome)"].value_counts()
+        afiliados = por_afiliado["Vendas"].sort_values(ascending=False, kind="stable")
         st.bar_chart(afiliados)
 
+        # Desempenho detalhado por afiliado
+        st.subheader("📋 Desempenho por Afiliado")
+        st.dataframe(por_afiliado.round(2))
+
         # Exportar CSV filtrado
         st.download_button("📂 Baixar Relatório Filtrado", df_filtrado.to_csv(index=False).encode('utf-8'), "relatorio_filtrado.csv", "text/csv")
 
@@ -203,11 +253,22 @@ def main():
 
         pergunta_manual = st.text_input("Ou digite sua pergunta:")
 
+        # Rankings mantidos só valem sem filtros aplicados
+        rankings = None
+        sem_filtros = (
+            data_inicio <= data_min.date() and data_fim >= data_max.date()
+            and afiliado == "Todos" and cidade == "Todos"
+        )
+        if sem_filtros:
+            from rankings import rankings_da_sessao
+
+            rankings = rankings_da_sessao(df_filtrado, chave_arquivo)
+
         if pergunta_selecionada:
-            resposta = interpretar_pergunta(pergunta_selecionada, df_filtrado)
+            resposta = interpretar_pergunta(pergunta_selecionada, df_filtrado, rankings)
             st.info(resposta)
         elif pergunta_manual:
-            resposta = interpretar_pergunta(pergunta_manual, df_filtrado)
+            resposta = interpretar_pergunta(pergunta_manual, df_filtrado, rankings)
             st.info(resposta)
 
 if __name__ == "__main__":
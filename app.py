@@ -1,9 +1,13 @@
 import streamlit as st
-import pandas as pd
-import matplotlib.pyplot as plt
+
+from aquecimento import iniciar_aquecimento, tarefas_snapshot, salvar_snapshot, usar_snapshot, chave_snapshot
+
+NOME_APP = "app"
 
 # 1. Função para carregar dados
 def carregar_dados(caminho_csv):
+    import pandas as pd
+
     df = pd.read_csv(caminho_csv, delimiter=";")
     
     # Converter datas
@@ -14,7 +18,9 @@ def carregar_dados(caminho_csv):
     return df
 
 # 2. Função para gerar insights
-def gerar_insights(df):
+def gerar_insights(df, rankings):
+    import pandas as pd
+
     insights = []
 
     # Conversões seguras para números
@@ -59,23 +65,23 @@ def gerar_insights(df):
 
     # Vendas por Cidade
     if 'Cliente (Cidade)' in df.columns:
-        vendas_cidade = df['Cliente (Cidade)'].value_counts().nlargest(5)
+        vendas_cidade = rankings.top_contagem('Cliente (Cidade)', 5)
         insights.append("🏙️ Vendas por Cidade (Top 5):")
-        for cidade, count in vendas_cidade.items():
+        for cidade, count in vendas_cidade:
             insights.append(f"  {cidade}: {count} vendas")
 
     # Vendas por Estado
     if 'Cliente (Estado)' in df.columns:
-        vendas_estado = df['Cliente (Estado)'].value_counts().nlargest(5)
+        vendas_estado = rankings.top_contagem('Cliente (Estado)', 5)
         insights.append("🏠 Vendas por Estado (Top 5):")
-        for estado, count in vendas_estado.items():
+        for estado, count in vendas_estado:
             insights.append(f"  {estado}: {count} vendas")
 
     # Vendas por Afiliado
     if 'Afiliado (Nome)' in df.columns:
-        vendas_afiliado = df['Afiliado (Nome)'].value_counts().nlargest(5)
+        vendas_afiliado = rankings.top_contagem('Afiliado (Nome)', 5)
         insights.append("🤝 Vendas por Afiliado (Top 5):")
-        for afiliado, count in vendas_afiliado.items():
+        for afiliado, count in vendas_afiliado:
             insights.append(f"  {afiliado}: {count} vendas")
 
     # Parcelamento sem juros
@@ -90,6 +96,8 @@ def gerar_insights(df):
 # 3. Função para gerar gráfico de vendas diárias
 def gerar_grafico(df):
     if 'Iniciada em' in df.columns and 'Total' in df.columns:
+        import matplotlib.pyplot as plt
+
         df_temp = df.copy()
         df_temp = df_temp.set_index('Iniciada em')
         vendas_diarias = df_temp['Total'].resample('D').sum()
@@ -108,15 +116,24 @@ def main():
     st.set_page_config(page_title="Agente de Análise de Vendas", layout="wide")
     st.title("🤖 Agente de Análise de Vendas")
 
+    iniciar_aquecimento(tarefas_snapshot(NOME_APP))
+
     arquivo = st.file_uploader("Faça upload do arquivo CSV", type=["csv"])
 
     if arquivo is not None:
         df = carregar_dados(arquivo)
-        
+        salvar_snapshot(df, NOME_APP, arquivo.file_id)
+    else:
+        df = usar_snapshot(NOME_APP)
+
+    if df is not None:
         st.subheader("📋 Pré-visualização dos Dados")
         st.dataframe(df.head(20))
 
-        insights = gerar_insights(df)
+        from rankings import rankings_da_sessao
+
+        rankings = rankings_da_sessao(df, arquivo.file_id if arquivo is not None else chave_snapshot(NOME_APP))
+        insights = gerar_insights(df, rankings)
 
         st.subheader("🔍 Insights Automáticos")
         for insight in insights:
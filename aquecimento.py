@@ -0,0 +1,129 @@
+# Pré-carregamento opcional (warm start) dos apps
+# Ativado com SALESDATAAGENT_WARM_START=1: em segundo plano, carrega o modelo
+# de intenções e o último dataset usado enquanto o uploader já está na tela.
+#
+# ATENÇÃO: o snapshot contém dados de clientes (e-mails, cidades, valores).
+# Ele é salvo por usuário logado (st.login) e nunca é compartilhado entre
+# usuários. Sem login, o snapshot só é ativado com SALESDATAAGENT_USO_INDIVIDUAL=1,
+# que declara que o servidor é de uso de UMA pessoa só: todo visitante do
+# servidor enxergaria o último dataset enviado.
+
+import hashlib
+import os
+import threading
+from pathlib import Path
+
+import streamlit as st
+
+AQUECIMENTO_ATIVO = os.environ.get("SALESDATAAGENT_WARM_START", "0") == "1"
+USO_INDIVIDUAL = os.environ.get("SALESDATAAGENT_USO_INDIVIDUAL", "0") == "1"
+PASTA_SNAPSHOT = Path(os.environ.get("SALESDATAAGENT_SNAPSHOT_DIR", Path.home() / ".salesdataagent"))
+
+_threads = {}
+_resultados = {}
+_lock = threading.Lock()
+
+# Dono do snapshot nesta sessão (None quando o snapshot está desativado)
+def dono_snapshot():
+    if not AQUECIMENTO_ATIVO:
+        return None
+    usuario = getattr(st, "user", None)
+    if usuario is not None and usuario.get("is_logged_in") and usuario.get("email"):
+        return hashlib.sha256(usuario["email"].encode("utf-8")).hexdigest()[:16]
+    if USO_INDIVIDUAL:
+        return "local"
+    return None
+
+# Caminho do snapshot do último dataset de cada app e de cada dono
+def caminho_snapshot(nome_app, dono):
+    return PASTA_SNAPSHOT / f"{nome_app}-{dono}.parquet"
+
+# Identifica o snapshot atual (dono + momento da gravação), para chaves de cache
+def chave_snapshot(nome_app):
+    dono = dono_snapshot()
+    return f"snapshot:{nome_app}:{dono}:{caminho_snapshot(nome_app, dono).stat().st_mtime_ns}"
+
+def _tarefa_snapshot(nome_app, dono):
+    return f"snapshot:{nome_app}:{dono}"
+
+# Tarefas de aquecimento do snapshot da sessão atual
+def tarefas_snapshot(nome_app):
+    dono = dono_snapshot()
+    if dono is None:
+        return {}
+    return {_tarefa_snapshot(nome_app, dono): lambda: carregar_snapshot(nome_app, dono)}
+
+# Salva o dataset já processado para o próximo warm start
+# (uma vez por arquivo enviado, não a cada rerun)
+def salvar_snapshot(df, nome_app, chave_arquivo):
+    dono = dono_snapshot()
+    if dono is None or st.session_state.get("snapshot_salvo") == (nome_app, chave_arquivo):
+        return
+    # Marca a tentativa antes de gravar: se falhar, o aviso aparece uma vez só
+    st.session_state["snapshot_salvo"] = (nome_app, chave_arquivo)
+    try:
+        PASTA_SNAPSHOT.mkdir(mode=0o700, parents=True, exist_ok=True)
+        df.to_parquet(caminho_snapshot(nome_app, dono))
+    except Exception as e:
+        st.warning(f"Não foi possível salvar o último dataset para o warm start: {e}")
+        return
+    # O que foi pré-carregado ficou velho: a próxima leitura vem do disco
+    with _lock:
+        _threads.pop(_tarefa_snapshot(nome_app, dono), None)
+        _resultados.pop(_tarefa_snapshot(nome_app, dono), None)
+
+# Lê o snapshot do último dataset (None se não existir)
+def carregar_snapshot(nome_app, dono):
+    caminho = caminho_snapshot(nome_app, dono)
+    if not caminho.exists():
+        return None
+    import pandas as pd
+    return pd.read_parquet(caminho)
+
+def _executar(nome, funcao):
+    try:
+        _resultados[nome] = (funcao(), None)
+    except Exception as e:
+        _resultados[nome] = (None, e)
+
+# Dispara cada tarefa em uma thread de fundo, uma única vez por processo
+def iniciar_aquecimento(tarefas):
+    if not AQUECIMENTO_ATIVO:
+        return
+    with _lock:
+        for nome, funcao in tarefas.items():
+            if nome in _threads:
+                continue
+            thread = threading.Thread(target=_executar, args=(nome, funcao), name=f"aquecimento-{nome}", daemon=True)
+            _threads[nome] = thread
+            thread.start()
+
+# Resultado de uma tarefa pré-carregada; sem aquecimento, executa `funcao` na hora.
+# Erros da thread de fundo são relançados aqui, na thread do app.
+def obter(nome, funcao=None):
+    with _lock:
+        thread = _threads.get(nome)
+    if thread is None:
+        return funcao() if funcao is not None else None
+    thread.join()
+    resultado, erro = _resultados.get(nome, (None, None))
+    if erro is not None:
+        raise erro
+    if resultado is None and funcao is not None:
+        return funcao()
+    return resultado
+
+# Oferece o último dataset quando nenhum arquivo foi enviado
+# (devolve uma cópia: os apps alteram o DataFrame a cada rerun)
+def usar_snapshot(nome_app):
+    dono = dono_snapshot()
+    if dono is None or not caminho_snapshot(nome_app, dono).exists():
+        return None
+    if not st.checkbox("♻️ Usar o último dataset carregado"):
+        return None
+    try:
+        df = obter(_tarefa_snapshot(nome_app, dono), lambda: carregar_snapshot(nome_app, dono))
+    except Exception as e:
+        st.warning(f"Não foi possível ler o último dataset: {e}")
+        return None
+    return df.copy() if df is not None else None
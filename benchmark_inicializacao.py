@@ -0,0 +1,53 @@
+# Benchmark do tempo de inicialização de cada app
+# Mede, em um interpretador novo por rodada, quanto tempo cada app leva até
+# desenhar a primeira tela (o uploader de CSV), rodando main() com o AppTest
+# do Streamlit. Como referência, mede também o mesmo app com os imports
+# pesados que ele fazia no topo do arquivo antes de serem adiados.
+# Uso: python benchmark_inicializacao.py [rodadas]
+
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+# Imports que cada app fazia no topo (base de comparação)
+IMPORTS_ANTIGOS = {
+    "app.py": ["pandas", "matplotlib.pyplot"],
+    "app-llm.py": ["pandas", "matplotlib.pyplot"],
+    "app-llm-vpro.py": ["pandas", "numpy"],
+    "app-v6-llm.py": ["pandas", "numpy", "sklearn.feature_extraction.text", "sklearn.metrics.pairwise"],
+}
+
+CODIGO_MEDICAO = """
+import importlib, sys, time
+inicio = time.perf_counter()
+for modulo in sys.argv[2:]:
+    importlib.import_module(modulo)
+from streamlit.testing.v1 import AppTest
+app = AppTest.from_file(sys.argv[1]).run(timeout=120)
+fim = time.perf_counter()
+if app.exception or not app.get("file_uploader"):
+    sys.exit(f"{sys.argv[1]} não chegou ao uploader: {app.exception}")
+print(fim - inicio)
+"""
+
+# Tempo (s) até o uploader aparecer, em um processo novo
+def medir_inicializacao(caminho_app, imports=()):
+    resultado = subprocess.run(
+        [sys.executable, "-c", CODIGO_MEDICAO, str(caminho_app), *imports],
+        capture_output=True, text=True, check=True, cwd=Path(caminho_app).parent
+    )
+    return float(resultado.stdout.strip().splitlines()[-1])
+
+def main():
+    rodadas = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    pasta = Path(__file__).resolve().parent
+
+    print(f"{'App':<20} {'Atual (ms)':>12} {'Imports no topo (ms)':>22}")
+    for app, imports in IMPORTS_ANTIGOS.items():
+        atual = [medir_inicializacao(pasta / app) for _ in range(rodadas)]
+        antigo = [medir_inicializacao(pasta / app, imports) for _ in range(rodadas)]
+        print(f"{app:<20} {statistics.median(atual) * 1000:>12.1f} {statistics.median(antigo) * 1000:>22.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+# Rankings mantidos na ingestão (top afiliados, cidades, estados)
+# Cada ranking guarda as chaves já ordenadas: novas vendas atualizam só as
+# chaves afetadas e o top-k, por contagem ou faturamento, sai em O(k).
+
+from bisect import bisect_left, insort
+
+import pandas as pd
+import streamlit as st
+
+COLUNAS_RANKING = ["Afiliado (Nome)", "Cliente (Cidade)", "Cliente (Estado)"]
+
+# Ranking de uma dimensão, ordenado por valor decrescente
+# (empates na ordem em que a chave apareceu, como no value_counts)
+class RankingIncremental:
+    def __init__(self):
+        self._valores = {}
+        self._chegada = {}
+        self._ordenado = []
+
+    def adicionar(self, chave, incremento):
+        if chave in self._valores:
+            valor = self._valores[chave]
+            entrada = (-valor, self._chegada[chave], chave)
+            del self._ordenado[bisect_left(self._ordenado, entrada)]
+        else:
+            valor = 0
+            self._chegada[chave] = len(self._chegada)
+        valor += incremento
+        self._valores[chave] = valor
+        insort(self._ordenado, (-valor, self._chegada[chave], chave))
+
+    # Lista de (chave, valor) das k maiores; k=None devolve todas
+    def top(self, k=None):
+        return [(chave, -valor) for valor, _, chave in self._ordenado[:k]]
+
+    def __len__(self):
+        return len(self._valores)
+
+# Rankings de contagem e faturamento para cada coluna de COLUNAS_RANKING
+class RankingsVendas:
+    def __init__(self, colunas=COLUNAS_RANKING):
+        self.contagem = {coluna: RankingIncremental() for coluna in colunas}
+        self.faturamento = {coluna: RankingIncremental() for coluna in colunas}
+
+    # Incorpora um lote de vendas (agrega o lote e atualiza só as chaves dele)
+    # Totais não numéricos contam como 0 no faturamento, como no to_numeric dos apps
+    def ingerir(self, df):
+        total = pd.to_numeric(df["Total"], errors="coerce") if "Total" in df.columns else None
+        for coluna in self.contagem:
+            if coluna not in df.columns:
+                continue
+            grupos = df.groupby(coluna, sort=False)
+            for chave, quantidade in grupos.size().items():
+                self.contagem[coluna].adicionar(chave, int(quantidade))
+            if total is not None:
+                for chave, valor in total.groupby(df[coluna], sort=False).sum().items():
+                    self.faturamento[coluna].adicionar(chave, float(valor))
+
+    def top_contagem(self, coluna, k=None):
+        return self.contagem[coluna].top(k)
+
+    def top_faturamento(self, coluna, k=None):
+        return self.faturamento[coluna].top(k)
+
+# Rankings do dataset atual, guardados na sessão para não refazer a cada rerun
+# Os apps trocam o dataset inteiro a cada arquivo: aqui os rankings são montados
+# de uma vez por `chave` (um único ingerir), não atualizados venda a venda
+def rankings_da_sessao(df, chave):
+    guardado = st.session_state.get("rankings_vendas")
+    if guardado is None or guardado[0] != chave:
+        rankings = RankingsVendas()
+        rankings.ingerir(df)
+        guardado = (chave, rankings)
+        st.session_state["rankings_vendas"] = guardado
+    return guardado[1]
@@ -0,0 +1,43 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# Os módulos do projeto ficam na raiz, ao lado dos apps
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+
+def _gerar_vendas(n_pedidos=4000, semente=7):
+    rng = np.random.default_rng(semente)
+    linhas_por_pedido = rng.integers(1, 4, n_pedidos)
+    pedidos = np.repeat(np.arange(n_pedidos), linhas_por_pedido)
+    n = len(pedidos)
+
+    afiliados = np.array([f"Afiliado {i}" for i in range(300)] + [np.nan], dtype=object)
+    cidades = np.array([f"Cidade {i}" for i in range(120)] + [np.nan], dtype=object)
+    estados = np.array(["SP", "RJ", "MG", "BA", "PR", "RS", "PE", "CE", np.nan], dtype=object)
+    # Horário em segundos: sem empates de data dentro de um pedido
+    datas = pd.Timestamp("2024-01-01") + pd.to_timedelta(rng.integers(0, 120 * 86_400, n), unit="s")
+
+    # Afiliado, cidade e estado são do pedido; afiliados com pesos desiguais
+    df = pd.DataFrame({
+        "Código": [f"P{p}" for p in pedidos],
+        "Afiliado (Nome)": afiliados[np.minimum(rng.zipf(1.3, n_pedidos), len(afiliados)) - 1][pedidos],
+        "Cliente (Cidade)": cidades[rng.integers(0, len(cidades), n_pedidos)][pedidos],
+        "Cliente (Estado)": estados[rng.integers(0, len(estados), n_pedidos)][pedidos],
+        "Status": rng.choice(["Aprovada", "Estornada", "Recusada"], n),
+        "Total": rng.integers(1, 40_000, n) * 0.25,
+        "Comissão": rng.integers(0, 4_000, n) * 0.25,
+        "Iniciada em": datas,
+    })
+    df.loc[rng.random(n) < 0.03, "Total"] = np.nan
+    df.loc[rng.random(n) < 0.02, "Iniciada em"] = pd.NaT
+    return df
+
+
+# Gerador de vendas sintéticas (valores múltiplos de 0,25: somas exatas em float)
+@pytest.fixture(scope="session")
+def gerar_vendas():
+    return _gerar_vendas
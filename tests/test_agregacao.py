@@ -0,0 +1,94 @@
+import runpy
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pandas.testing as pdt
+import pytest
+
+import agregacao
+from agregacao import COLUNAS_METRICAS, agregar_por_segmento
+
+RAIZ = Path(__file__).resolve().parent.parent
+
+
+def esperado_pandas(df, coluna):
+    grupos = df.groupby(coluna)
+    esperado = pd.DataFrame({
+        "Vendas": grupos.size(),
+        "Faturamento": grupos["Total"].sum(),
+        "Comissão": grupos["Comissão"].sum(),
+    })
+    # Sem nenhum Total preenchido, o ticket médio é 0 (como no app), não NaN
+    esperado["Ticket Médio"] = (esperado["Faturamento"] / grupos["Total"].count()).fillna(0.0)
+    return esperado
+
+
+@pytest.mark.parametrize("coluna", ["Afiliado (Nome)", "Cliente (Cidade)"])
+def test_paralelo_igual_ao_pandas(monkeypatch, gerar_vendas, coluna):
+    monkeypatch.setattr(agregacao, "LIMITE_PARALELO", 0)
+    df = gerar_vendas()
+
+    paralelo = agregar_por_segmento(df, coluna, processos=3)
+    esperado = esperado_pandas(df, coluna)
+
+    assert sorted(paralelo.index) == sorted(esperado.index)
+    for metrica in ["Vendas", "Faturamento", "Ticket Médio", "Comissão"]:
+        pdt.assert_series_equal(
+            paralelo[metrica].reindex(esperado.index), esperado[metrica],
+            check_names=False, check_dtype=False, check_index_type=False
+        )
+
+
+def test_paralelo_igual_ao_serial(monkeypatch, gerar_vendas):
+    df = gerar_vendas()
+    serial = agregar_por_segmento(df, "Afiliado (Nome)", processos=1)
+
+    monkeypatch.setattr(agregacao, "LIMITE_PARALELO", 0)
+    paralelo = agregar_por_segmento(df, "Afiliado (Nome)", processos=4)
+
+    pdt.assert_frame_equal(paralelo.loc[serial.index], serial)
+
+
+def test_estornos_seguem_calcular_estorno(gerar_vendas):
+    calcular_estorno = runpy.run_path(str(RAIZ / "app-llm-vpro.py"))["calcular_estorno"]
+    df = gerar_vendas(n_pedidos=600)
+
+    resultado = agregar_por_segmento(df, "Afiliado (Nome)")
+
+    for afiliado, linha in resultado.iterrows():
+        do_afiliado = df[df["Afiliado (Nome)"] == afiliado]
+        assert linha["% Estornos"] == pytest.approx(calcular_estorno(do_afiliado))
+
+
+@pytest.mark.parametrize("processos", [1, 2])
+def test_estornos_pela_ultima_linha_do_pedido(monkeypatch, processos):
+    monkeypatch.setattr(agregacao, "LIMITE_PARALELO", 0)
+    df = pd.DataFrame({
+        "Código": ["P1", "P1", "P2", "P2", "P3", "P4", "P4"],
+        # P1 troca de afiliado; a última linha de P2 não tem afiliado; P4 vem fora de ordem
+        "Afiliado (Nome)": ["Ana", "Bia", "Ana", np.nan, "Ana", "Bia", "Bia"],
+        "Status": ["Estornada", "Aprovada", "Aprovada", "Estornada", "Aprovada", "Estornada", "Aprovada"],
+        "Total": [10.0] * 7,
+        "Iniciada em": pd.to_datetime([
+            "2024-01-01", "2024-01-05", "2024-01-01", "2024-01-03", "2024-01-02", "2024-01-10", "2024-01-02",
+        ]),
+    })
+
+    resultado = agregar_por_segmento(df, "Afiliado (Nome)", processos=processos)
+
+    # Ana: só P3, aprovado (P1 terminou com Bia; P2 terminou sem afiliado e não
+    # herda "Ana" da linha anterior, como faria groupby().last()).
+    # Bia: P1 aprovado e P4, cuja última linha por data é a estornada.
+    assert resultado.loc["Ana", "% Estornos"] == 0.0
+    assert resultado.loc["Bia", "% Estornos"] == 50.0
+
+
+def test_frame_vazio(monkeypatch, gerar_vendas):
+    monkeypatch.setattr(agregacao, "LIMITE_PARALELO", 0)
+    df = gerar_vendas().iloc[0:0]
+
+    resultado = agregar_por_segmento(df, "Afiliado (Nome)", processos=3)
+
+    assert resultado.empty
+    assert list(resultado.columns) == COLUNAS_METRICAS
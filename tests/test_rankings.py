@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from rankings import COLUNAS_RANKING, RankingsVendas
+
+
+def ingerir_em_lotes(df, tamanho_lote):
+    rankings = RankingsVendas()
+    for inicio in range(0, len(df), tamanho_lote):
+        rankings.ingerir(df.iloc[inicio:inicio + tamanho_lote])
+    return rankings
+
+
+@pytest.fixture(scope="module")
+def vendas(gerar_vendas):
+    df = gerar_vendas(n_pedidos=30_000, semente=11)
+    return df, ingerir_em_lotes(df, 10_000)
+
+
+@pytest.mark.parametrize("coluna", COLUNAS_RANKING)
+@pytest.mark.parametrize("k", [1, 5, None])
+def test_contagem_igual_ao_value_counts(vendas, coluna, k):
+    df, rankings = vendas
+    esperado = list(df[coluna].value_counts().items())
+    assert rankings.top_contagem(coluna, k) == esperado[:k]
+
+
+@pytest.mark.parametrize("coluna", COLUNAS_RANKING)
+@pytest.mark.parametrize("k", [1, 5, None])
+def test_faturamento_igual_ao_groupby(vendas, coluna, k):
+    df, rankings = vendas
+    esperado = list(df.groupby(coluna)["Total"].sum().sort_values(ascending=False).items())
+    assert rankings.top_faturamento(coluna, k) == esperado[:k]
+
+
+def test_empates_na_ordem_de_chegada():
+    df = pd.DataFrame({
+        "Afiliado (Nome)": ["Bia", "Ana", np.nan, "Bia", "Caio", "Ana", "Caio", "Davi", np.nan],
+        "Cliente (Cidade)": ["Recife"] * 9,
+        "Cliente (Estado)": ["PE"] * 9,
+        "Total": [10.0] * 9,
+    })
+    rankings = ingerir_em_lotes(df, 2)
+
+    esperado = list(df["Afiliado (Nome)"].value_counts().items())
+    assert rankings.top_contagem("Afiliado (Nome)") == esperado
+    assert rankings.top_contagem("Afiliado (Nome)") == [("Bia", 2), ("Ana", 2), ("Caio", 2), ("Davi", 1)]
+    assert rankings.top_faturamento("Afiliado (Nome)", 1) == [("Bia", 20.0)]
+
+
+def test_coluna_ausente_fica_vazia():
+    rankings = RankingsVendas()
+    rankings.ingerir(pd.DataFrame({"Afiliado (Nome)": ["Ana"], "Total": [5.0]}))
+
+    assert rankings.top_contagem("Cliente (Cidade)") == []
+    assert rankings.top_contagem("Afiliado (Nome)", 5) == [("Ana", 1)]
+
+
+def test_total_nao_numerico_e_convertido():
+    rankings = RankingsVendas()
+    rankings.ingerir(pd.DataFrame({"Afiliado (Nome)": ["Ana", "Bia"], "Total": [10.0, 4.0]}))
+    rankings.ingerir(pd.DataFrame({"Afiliado (Nome)": ["Bia", "Bia", "Ana"], "Total": ["7.5", "inválido", None]}))
+
+    assert rankings.top_contagem("Afiliado (Nome)") == [("Bia", 3), ("Ana", 2)]
+    assert rankings.top_faturamento("Afiliado (Nome)") == [("Bia", 11.5), ("Ana", 10.0)]